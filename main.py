@@ -1,23 +1,43 @@
 import datetime
+import fnmatch
 import json
 import os
+import re
 import shutil
 import subprocess
 import sys
+import threading
 import time
 import requests
 from PyQt6 import QtCharts, QtWidgets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
-from PyQt6 import QtCore
+from PyQt6 import QtCore, QtNetwork
 
 from PyQt6.QtGui import QPixmap, QPalette, QBrush, QFont
-from PyQt6.QtWidgets import (QApplication, QWidget, QPushButton, QRadioButton, QTimeEdit,
+from PyQt6.QtWidgets import (QApplication, QWidget, QPushButton, QRadioButton, QTimeEdit, QCheckBox,
                              QVBoxLayout, QHBoxLayout, QMessageBox, QLabel, QTableWidget, QHeaderView,
                              QAbstractItemView, QTableWidgetItem, QFileDialog)
 from PyQt6.QtCore import QTimer, QTime
 
 CODE_LICENSE = "AAAAABljWUkaZ6D-xWlhfYwWoLZfMGrxg0TgwfiBZbvaja5Doz0EfPZj6AV-Ilcc0M4mHI"
 
+# Имя локального сокета для запросов внешних программ (в папке Crono)
+QUERY_SOCKET = "crono.sock"
+# Глобальные флаги в начале регулярного выражения, например (?i)
+GLOBAL_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+# Ссылки на группы: обратные (\1, (?P=name)), неэкранированные обратным слэшем, и условия (?(1)...)
+BACKREFERENCE = re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]|\(\?P=|\(\?\(")
+# Категория для приложений, не попавших ни под одно правило
+OTHER_CATEGORY = "Другое"
+# Правила по умолчанию, если в config.json нет ключа "categories".
+# Правило - точное имя, glob-шаблон (*, ?, [...]) или регулярное выражение с префиксом "re:"
+DEFAULT_CATEGORIES = {
+    "Разработка": ["PyCharm", "Xcode", "Terminal", "iTerm2", "Code", "re:^(IntelliJ|CLion|WebStorm).*"],
+    "Общение": ["Telegram", "Slack", "Discord", "Mail", "Messages", "zoom.us", "WhatsApp"],
+    "Браузеры": ["Safari", "Firefox", "Opera", "Arc", "Google Chrome*", "Yandex*"],
+}
+
 
 # Сборка:  pyinstaller main.spec
 
@@ -27,6 +47,65 @@ def reset_json(filename: str) -> None:
         f.write("{}")
 
 
+def read_json(filename: str) -> dict:
+    """
+    Читает словарь из json файла.
+
+    Аргументы:
+        filename: путь к json файлу.
+
+    Возвращает:
+        содержимое файла или пустой словарь, если файла нет.
+    """
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, "r") as f:
+        return dict(json.load(f))
+
+
+def increment_json_value(filename: str, key: str, value: int = 1) -> None:
+    """
+    Увеличивает значение по ключу в json файле, создавая файл при необходимости.
+
+    Аргументы:
+        filename: путь к json файлу.
+        key: ключ, значение которого нужно увеличить.
+        value: на сколько увеличить (по умолчанию 1).
+
+    Ничего не возвращает.
+    """
+    if not os.path.exists(filename):
+        reset_json(filename)
+    with open(filename, "r+") as f:
+        data = dict(json.load(f))
+        data[key] = data.get(key, 0) + value
+        f.seek(0)
+        json.dump(data, f, ensure_ascii=False, indent=4)
+        f.truncate()
+
+
+def write_report(filename: str, total_time: int, apps: dict, categories: dict) -> None:
+    """
+    Записывает текстовый отчет о времени в приложениях и категориях.
+
+    Аргументы:
+        filename: путь к файлу отчета.
+        total_time: общее время сеанса в секундах.
+        apps: словарь {приложение: секунды}.
+        categories: словарь {категория: секунды}.
+
+    Ничего не возвращает.
+    """
+    with open(filename, "w") as f:
+        f.write(f"Общее время: {format_time(total_time)}\n\n")
+        f.write("Время в приложениях:\n")
+        for app, seconds in apps.items():
+            f.write(f"{{{app}: {str(datetime.timedelta(seconds=seconds))}}}\n")
+        f.write("\nВремя по категориям:\n")
+        for category, seconds in categories.items():
+            f.write(f"{{{category}: {str(datetime.timedelta(seconds=seconds))}}}\n")
+
+
 def clear_folder(folder_path):
     for filename in os.listdir(folder_path):
         # Получаем полный путь к файлу или подпапке
@@ -109,11 +188,563 @@ def get_active_app_name() -> str:
     end tell
     return frontApp
     """
-    output = subprocess.check_output(["osascript", "-e", script])
+    output = subprocess.check_output(["osascript", "-e", script], timeout=5)
     return output.strip().decode("utf-8")
 
 
+class AppClassifier:
+    """
+    Относит приложения к категориям по пользовательским правилам.
+
+    Точные имена проверяются по словарю, а все glob-шаблоны и регулярные выражения
+    собираются в одно регулярное выражение. Результаты запоминаются в кэше,
+    который очищается при смене правил.
+    """
+
+    def __init__(self, rules: dict = None):
+        self.rules = {}
+        self._exact = {}
+        self._pattern = None
+        self._pattern_categories = {}
+        self._cache = {}
+        self.set_rules(rules or {})
+
+    def set_rules(self, rules: dict) -> bool:
+        """
+        Компилирует правила вида {категория: [правило, ...]}.
+
+        Аргументы:
+            rules: словарь категорий и списков правил.
+
+        Возвращает:
+            True, если правила изменились и кэш был сброшен.
+
+        Вызывает ValueError, если правила не являются словарем списков строк
+        или содержат некорректное регулярное выражение.
+        """
+        if not isinstance(rules, dict):
+            raise ValueError("Категории в config.json должны быть словарем {категория: [правило, ...]}")
+        for category, category_rules in rules.items():
+            if not isinstance(category_rules, list) or not all(isinstance(rule, str) for rule in category_rules):
+                raise ValueError(f"Правила категории '{category}' должны быть списком строк")
+        # порядок категорий важен: при совпадении нескольких правил выигрывает первая
+        if list(rules.items()) == list(self.rules.items()):
+            return False
+        exact = {}
+        parts = []
+        pattern_categories = {}
+        for category, category_rules in rules.items():
+            for rule in category_rules:
+                if rule.startswith("re:"):
+                    regex = self._prepare_regex(rule, category)
+                elif any(char in rule for char in "*?["):
+                    regex = fnmatch.translate(rule)
+                else:
+                    exact.setdefault(rule, category)
+                    continue
+                group = f"_c{len(parts)}"
+                pattern_categories[group] = category
+                parts.append(f"(?P<{group}>{regex})")
+        try:
+            pattern = re.compile("|".join(parts)) if parts else None
+        except re.error as e:
+            raise ValueError(f"Некорректные правила категорий: {e}")
+        self.rules = {category: list(category_rules) for category, category_rules in rules.items()}
+        self._exact = exact
+        self._pattern = pattern
+        self._pattern_categories = pattern_categories
+        self._cache = {}
+        return True
+
+    @staticmethod
+    def _prepare_regex(rule: str, category: str) -> str:
+        """
+        Проверяет правило "re:..." и готовит его к объединению с остальными.
+
+        Глобальные флаги в начале, например (?i), превращаются в флаги группы (?i:...),
+        так как в общем выражении они уже не стоят в начале. Обратные ссылки, условия по группам
+        и именованные группы запрещены: в общем выражении номера групп сдвигаются, а имена могут совпасть.
+
+        Аргументы:
+            rule: правило с префиксом "re:".
+            category: категория правила (для текста ошибки).
+
+        Возвращает:
+            регулярное выражение без префикса.
+
+        Вызывает ValueError при некорректном правиле.
+        """
+        regex = rule[3:]
+        flags = GLOBAL_FLAGS.match(regex)
+        if flags:
+            regex = f"(?{flags.group(1)}:{regex[flags.end():]})"
+        try:
+            compiled = re.compile(regex)
+        except re.error as e:
+            raise ValueError(f"Некорректное правило '{rule}' в категории '{category}': {e}")
+        if compiled.groupindex:
+            raise ValueError(f"Правило '{rule}' в категории '{category}': именованные группы не поддерживаются")
+        if BACKREFERENCE.search(regex):
+            raise ValueError(f"Правило '{rule}' в категории '{category}': ссылки на группы не поддерживаются")
+        return regex
+
+    def classify(self, app_name: str) -> str:
+        """
+        Возвращает категорию приложения.
+
+        Аргументы:
+            app_name: имя приложения.
+
+        Возвращает:
+            название категории или OTHER_CATEGORY, если ни одно правило не подошло.
+        """
+        category = self._cache.get(app_name)
+        if category is None:
+            category = self._exact.get(app_name)
+            if category is None and self._pattern is not None:
+                match = self._pattern.fullmatch(app_name)
+                if match:
+                    category = self._pattern_categories[match.lastgroup]
+            if category is None:
+                category = OTHER_CATEGORY
+            self._cache[app_name] = category
+        return category
+
+    def group(self, data: dict) -> dict:
+        """
+        Суммирует время приложений по категориям.
+
+        Аргументы:
+            data: словарь {приложение: секунды}.
+
+        Возвращает:
+            словарь {категория: секунды}.
+        """
+        result = {}
+        for app, seconds in data.items():
+            category = self.classify(app)
+            result[category] = result.get(category, 0) + seconds
+        return result
+
+
+class TrackerWorker(QtCore.QObject):
+    """
+    Считывает активное приложение и сохраняет статистику в отдельном потоке.
+
+    Изменения за тики копятся в буфере, сгруппированном по дням и приложениям, и забираются
+    интерфейсом через take_deltas. Пока интерфейс не забрал буфер, сигнал deltas_ready
+    повторно не отправляется, поэтому в очереди GUI-потока не больше одного уведомления,
+    а размер буфера ограничен числом разных приложений.
+
+    Отчеты записываются и отправляются в отдельном потоке, чтобы загрузка в Telegram
+    не задерживала ежесекундные тики.
+    """
+    deltas_ready = QtCore.pyqtSignal()
+    loaded = QtCore.pyqtSignal(dict)
+    report_sent = QtCore.pyqtSignal()
+    error = QtCore.pyqtSignal(str)
+
+    def __init__(self, send_time: str, token: str, chat_id: str):
+        super().__init__()
+        self.send_time = send_time
+        self.token = token
+        self.chat_id = chat_id
+        self._write_failed = False
+        self.classifier = AppClassifier()
+        self.timer = None
+        self.last_tick_duration = 0.0  # сколько занял последний тик (опрос + запись), в секундах
+        self._lock = threading.Lock()
+        self._deltas = {}
+        self._notified = False
+        self._generation = 0  # номер последнего снимка статистики, к которому относится буфер
+        self._reports = ThreadPoolExecutor(max_workers=1)
+
+    @QtCore.pyqtSlot()
+    def start_sampling(self) -> None:
+        """
+        Запускает ежесекундный опрос активного приложения.
+
+        Таймер создается здесь, чтобы он принадлежал потоку воркера.
+
+        Не принимает аргументов.
+
+        Ничего не возвращает.
+        """
+        if self.timer is None:
+            self.timer = QTimer(self)
+            self.timer.timeout.connect(self.tick)
+        self.timer.start(1000)
+
+    @QtCore.pyqtSlot()
+    def stop_sampling(self) -> None:
+        """
+        Останавливает опрос активного приложения.
+
+        Не принимает аргументов.
+
+        Ничего не возвращает.
+        """
+        if self.timer is not None:
+            self.timer.stop()
+
+    @QtCore.pyqtSlot()
+    def tick(self) -> None:
+        """
+        Считывает активное приложение, сохраняет секунду в json файлы и кладет изменение в буфер.
+
+        Не принимает аргументов.
+
+        Ничего не возвращает.
+        """
+        started = time.perf_counter()
+        # Отправка в определенное время
+        gmt4_time = time.gmtime(time.mktime(time.gmtime()) + 8 * 3600)  # GMT+4
+        report = self.send_time == time.strftime("%H:%M:%S", gmt4_time)
+        try:
+            app_name = get_active_app_name()
+        except (subprocess.SubprocessError, OSError):
+            return
+        category = self.classifier.classify(app_name)
+        today = str(date.today())
+
+        # при ошибке диска или поврежденном json тик пропускается, об ошибке сообщается один раз
+        try:
+            increment_json_value(resource_path(f"jsons/{today}"), app_name)
+            increment_json_value(resource_path(f"jsons/categories/{today}"), category)
+
+            # общая статистика
+            increment_json_value(resource_path("stats.json"), app_name)
+            increment_json_value(resource_path("category_stats.json"), category)
+        except (OSError, ValueError) as e:
+            if not self._write_failed:
+                self._write_failed = True
+                self.error.emit(f"Не удалось сохранить статистику: {e}")
+            return
+        self._write_failed = False
+        self.last_tick_duration = time.perf_counter() - started
+
+        with self._lock:
+            delta = self._deltas.setdefault(today, {"apps": {}, "categories": {}, "ticks": 0, "report": False})
+            delta["apps"][app_name] = delta["apps"].get(app_name, 0) + 1
+            delta["categories"][category] = delta["categories"].get(category, 0) + 1
+            delta["ticks"] += 1
+            delta["current"] = app_name
+            delta["report"] = delta["report"] or report
+            notify = not self._notified
+            self._notified = True
+        if notify:
+            self.deltas_ready.emit()
+
+    @QtCore.pyqtSlot(str, int, dict, dict)
+    def send_report(self, filename: str, total_time: int, apps: dict, categories: dict) -> None:
+        """
+        Ставит отчет в очередь на запись и отправку в Telegram.
+
+        Аргументы:
+            filename: путь к файлу отчета.
+            total_time: общее время сеанса в секундах.
+            apps: словарь {приложение: секунды} за период отчета.
+            categories: словарь {категория: секунды} за период отчета.
+
+        Ничего не возвращает.
+        """
+        self._reports.submit(self._send_report, filename, total_time, apps, categories)
+
+    def _send_report(self, filename: str, total_time: int, apps: dict, categories: dict) -> None:
+        """Записывает отчет и отправляет его в Telegram. Выполняется в потоке отчетов."""
+        try:
+            write_report(filename, total_time, apps, categories)
+            with open(filename, "rb") as document:
+                url = f"https://api.telegram.org/bot{self.token}/sendDocument?chat_id={self.chat_id}"
+                data = {"caption": f"Cтатистика за последние: {format_time(sum(apps.values()))}"}
+                response = requests.post(url, data=data, files={"document": document}, timeout=30)
+                response.raise_for_status()
+        except (OSError, ValueError, requests.RequestException) as e:
+            self.error.emit(f"Не удалось отправить отчет: {e}")
+            return
+        self.report_sent.emit()
+
+    def take_deltas(self, generation: int) -> dict:
+        """
+        Забирает накопленные изменения. Вызывается из GUI-потока.
+
+        Если интерфейс еще не применил последний снимок статистики, буфер не отдается:
+        изменения в нем относятся к новому снимку и будут забраны после его применения.
+
+        Аргументы:
+            generation: номер снимка, примененного интерфейсом.
+
+        Возвращает:
+            словарь {дата: {"apps", "categories", "ticks", "current", "report"}}.
+        """
+        with self._lock:
+            self._notified = False
+            if generation != self._generation:
+                return {}
+            deltas, self._deltas = self._deltas, {}
+        return deltas
+
+    @QtCore.pyqtSlot()
+    def load(self) -> None:
+        """
+        Перечитывает правила категорий и статистику и отправляет их в интерфейс сигналом loaded.
+
+        Если правила отличаются от тех, по которым считались итоги категорий,
+        история один раз переклассифицируется, иначе итоги читаются из category_stats.json.
+
+        Не принимает аргументов.
+
+        Ничего не возвращает.
+        """
+        os.makedirs(resource_path("jsons/categories"), exist_ok=True)
+        with open(resource_path("config.json"), "r") as f:
+            rules = json.load(f).get("categories", DEFAULT_CATEGORIES)
+        try:
+            self.classifier.set_rules(rules)
+        except ValueError as e:
+            self.error.emit(str(e))
+            if not self.classifier.rules:
+                self.classifier.set_rules(read_json(resource_path("categories_rules.json")) or DEFAULT_CATEGORIES)
+
+        processes = read_json(resource_path("stats.json"))
+        if (list(read_json(resource_path("categories_rules.json")).items()) != list(self.classifier.rules.items())
+                or not os.path.exists(resource_path("category_stats.json"))):
+            category_processes = self.rebuild_category_stats(processes)
+        else:
+            category_processes = read_json(resource_path("category_stats.json"))
+        self.emit_snapshot(processes, category_processes)
+
+    def rebuild_category_stats(self, processes: dict) -> dict:
+        """
+        Пересчитывает итоги категорий за все время и по дням по текущим правилам.
+
+        Аргументы:
+            processes: общая статистика {приложение: секунды}.
+
+        Возвращает:
+            итоги категорий за все время.
+        """
+        category_processes = self.classifier.group(processes)
+        with open(resource_path("category_stats.json"), "w") as f:
+            json.dump(category_processes, f, ensure_ascii=False, indent=4)
+
+        categories_dir = resource_path("jsons/categories")
+        clear_folder(categories_dir)
+        for filename in os.listdir(resource_path("jsons")):
+            try:
+                date.fromisoformat(filename)
+            except ValueError:
+                continue
+            data = read_json(resource_path(f"jsons/{filename}"))
+            with open(os.path.join(categories_dir, filename), "w") as f:
+                json.dump(self.classifier.group(data), f, ensure_ascii=False, indent=4)
+
+        with open(resource_path("categories_rules.json"), "w") as f:
+            json.dump(self.classifier.rules, f, ensure_ascii=False, indent=4)
+        return category_processes
+
+    @QtCore.pyqtSlot()
+    def reset(self) -> None:
+        """
+        Удаляет всю сохраненную статистику.
+
+        Не принимает аргументов.
+
+        Ничего не возвращает.
+        """
+        reset_json(resource_path("stats.json"))
+        reset_json(resource_path("category_stats.json"))
+        clear_folder(resource_path("jsons"))
+        os.makedirs(resource_path("jsons/categories"), exist_ok=True)
+        self.emit_snapshot({}, {})
+
+    def emit_snapshot(self, processes: dict, category_processes: dict) -> None:
+        """
+        Отправляет в интерфейс полную статистику и сбрасывает буфер изменений,
+        так как все они уже учтены в сохраненных файлах.
+
+        Аргументы:
+            processes: общая статистика по приложениям.
+            category_processes: общая статистика по категориям.
+
+        Ничего не возвращает.
+        """
+        today = date.today()
+        recent_days = {}
+        for n in range(1, 7):
+            day = str(today - timedelta(days=n))
+            recent_days[day] = {
+                "apps": read_json(resource_path(f"jsons/{day}")),
+                "categories": read_json(resource_path(f"jsons/categories/{day}")),
+            }
+        # изменения в буфере уже есть в файлах; новые изменения будут относиться к новому снимку
+        with self._lock:
+            self._deltas = {}
+            self._notified = False
+            self._generation += 1
+            generation = self._generation
+        self.loaded.emit({
+            "generation": generation,
+            "date": str(today),
+            "processes": processes,
+            "category_processes": category_processes,
+            "today": read_json(resource_path(f"jsons/{today}")),
+            "today_categories": read_json(resource_path(f"jsons/categories/{today}")),
+            "recent_days": recent_days,
+        })
+
+
+class QueryServer(QtCore.QObject):
+    """
+    Отвечает на запросы внешних программ (виджеты, shell, дашборды) через локальный сокет.
+
+    Протокол строковый: клиент присылает команду с переводом строки, сервер отвечает
+    одной строкой JSON. Ответы формирует handler из счетчиков в памяти, к диску сервер
+    не обращается. Команда "subscribe" подписывает клиента на строку "status" после
+    каждого обновления статистики. Клиенты, не успевающие читать ответы, отключаются.
+    """
+    MAX_PENDING_BYTES = 64 * 1024
+
+    def __init__(self, handler, parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self.handler = handler
+        self.subscribers = set()
+        self.server = QtNetwork.QLocalServer(self)
+        self.server.setSocketOptions(QtNetwork.QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self.accept)
+        self.error_string = ""
+
+    def listen(self, name: str) -> bool:
+        """
+        Начинает слушать сокет.
+
+        Сначала пробует подключиться к сокету: если это удалось, его слушает другая копия
+        трекера, и сокет не трогается. Файл удаляется, только если к нему никто не подключен,
+        то есть он остался от прошлого запуска.
+
+        Аргументы:
+            name: путь к сокету.
+
+        Возвращает:
+            True, если сокет открыт; иначе причина записывается в error_string.
+        """
+        probe = QtNetwork.QLocalSocket()
+        probe.connectToServer(name)
+        if probe.waitForConnected(500):
+            probe.disconnectFromServer()
+            self.error_string = "трекер уже запущен"
+            return False
+        if probe.error() not in (QtNetwork.QLocalSocket.LocalSocketError.ServerNotFoundError,
+                                 QtNetwork.QLocalSocket.LocalSocketError.ConnectionRefusedError):
+            self.error_string = probe.errorString()
+            return False
+        QtNetwork.QLocalServer.removeServer(name)
+        if not self.server.listen(name):
+            self.error_string = self.server.errorString()
+            return False
+        return True
+
+    def close(self) -> None:
+        """
+        Отключает всех клиентов и закрывает сокет.
+
+        Не принимает аргументов.
+
+        Ничего не возвращает.
+        """
+        self.subscribers.clear()
+        self.server.close()
+
+    def accept(self) -> None:
+        """
+        Принимает новые подключения.
+
+        Не принимает аргументов.
+
+        Ничего не возвращает.
+        """
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self.read(socket))
+            socket.disconnected.connect(lambda socket=socket: self.drop(socket))
+
+    def read(self, socket: QtNetwork.QLocalSocket) -> None:
+        """
+        Читает команды клиента и отвечает на каждую.
+
+        Аргументы:
+            socket: сокет клиента.
+
+        Ничего не возвращает.
+        """
+        while socket.canReadLine():
+            command = bytes(socket.readLine()).decode("utf-8", "replace").strip()
+            if not command:
+                continue
+            if command == "subscribe":
+                self.subscribers.add(socket)
+                command = "status"
+            elif command == "unsubscribe":
+                self.subscribers.discard(socket)
+                command = "status"
+            self.send(socket, self.encode(self.handler(command)))
+        if socket.bytesAvailable() > self.MAX_PENDING_BYTES:
+            socket.abort()
+
+    def publish(self) -> None:
+        """
+        Отправляет строку "status" всем подписчикам.
+
+        Не принимает аргументов.
+
+        Ничего не возвращает.
+        """
+        if self.subscribers:
+            line = self.encode(self.handler("status"))
+            for socket in list(self.subscribers):
+                self.send(socket, line)
+
+    def send(self, socket: QtNetwork.QLocalSocket, line: bytes) -> None:
+        """
+        Записывает ответ клиенту или отключает его, если он не читает ответы.
+
+        Аргументы:
+            socket: сокет клиента.
+            line: строка ответа.
+
+        Ничего не возвращает.
+        """
+        if socket.bytesToWrite() > self.MAX_PENDING_BYTES:
+            socket.abort()
+            return
+        socket.write(line)
+
+    def drop(self, socket: QtNetwork.QLocalSocket) -> None:
+        """
+        Забывает отключившегося клиента.
+
+        Аргументы:
+            socket: сокет клиента.
+
+        Ничего не возвращает.
+        """
+        self.subscribers.discard(socket)
+        socket.deleteLater()
+
+    @staticmethod
+    def encode(data: dict) -> bytes:
+        """Кодирует ответ в строку JSON с переводом строки."""
+        return (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+
+
 class TimeTracker(QWidget):
+    # сигналы для управления воркером, вызовы выполняются в его потоке
+    start_requested = QtCore.pyqtSignal()
+    stop_requested = QtCore.pyqtSignal()
+    load_requested = QtCore.pyqtSignal()
+    reset_requested = QtCore.pyqtSignal()
+    report_requested = QtCore.pyqtSignal(str, int, dict, dict)
+
     def __init__(self):
         super().__init__()
 
@@ -134,13 +765,12 @@ class TimeTracker(QWidget):
         self.setFixedSize(800, 700)
 
         # лицензия
+        self.license = False
         if os.path.exists(resource_path("key.txt")):
             with open(resource_path("key.txt"), "r") as f:
                 key = f.read().replace("\n", "")
             if key == CODE_LICENSE:
                 self.license = True
-        else:
-            self.license = False
 
         # Общее время
         self.label_total_time = QLabel("Прошло времени: 00:00:00")
@@ -183,6 +813,8 @@ class TimeTracker(QWidget):
         self.timer_radio.setFixedSize(350, 40)
         self.time_edit = QTimeEdit()
         self.time_edit.setFixedSize(350, 40)
+        self.categories_checkbox = QCheckBox('По категориям')
+        self.categories_checkbox.setStyleSheet("color: white; font-size: 22px;")
         self.process_table = QTableWidget()
         self.process_table.setColumnCount(2)
         self.process_table.setHorizontalHeaderLabels(["Приложение", "Время"])
@@ -195,27 +827,48 @@ class TimeTracker(QWidget):
         self.process_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.pause_button.setEnabled(False)
         self.time_edit.setEnabled(False)
-        self.timer = QTimer()
-        if not os.path.exists(resource_path("stats.json")):
-            with open(resource_path("stats.json"), "w") as f:
-                f.write("{}")
-                data = {}
-        else:
-            with open(str(resource_path("stats.json")), "r") as file:
-                data = json.load(file)
-        self.processes = data  # процессы и время
+        self.processes = {}  # процессы и время
+        self.category_processes = {}  # категории и время
+        self.today_date = str(date.today())
+        self.today_processes = {}  # процессы и время за сегодня
+        self.today_categories = {}  # категории и время за сегодня
+        self.recent_days = {}  # статистика за 6 предыдущих дней: {дата: {"apps", "categories"}}
+        self.generation = 0  # номер последнего примененного снимка статистики от воркера
+        self.apply_duration = 0.0  # сколько заняло последнее обновление интерфейса, в секундах
         self.current_process = None
         self.start_time = None
         self.pause_time = None
         self.mode = 'All time'
         self.limit = None
         self.total_time = 0
+        self.running = False
         self.send_time = "19:00:00"
         with open(resource_path("config.json"), "r") as f:
             data = json.load(f)
         self.TOKEN = data["TOKEN"]
         self.chat_id = data["chat_id"]
 
+        # опрос и запись статистики выполняются в отдельном потоке
+        self.worker_thread = QtCore.QThread()
+        self.worker = TrackerWorker(self.send_time, self.TOKEN, self.chat_id)
+        self.worker.moveToThread(self.worker_thread)
+        self.worker.deltas_ready.connect(self.apply_deltas)
+        self.worker.loaded.connect(self.apply_snapshot)
+        self.worker.error.connect(self.show_error)
+        self.worker.report_sent.connect(self.show_report_sent)
+        self.start_requested.connect(self.worker.start_sampling)
+        self.stop_requested.connect(self.worker.stop_sampling)
+        self.load_requested.connect(self.worker.load)
+        self.reset_requested.connect(self.worker.reset)
+        self.report_requested.connect(self.worker.send_report)
+        self.worker_thread.start()
+
+        # запросы внешних программ к счетчикам в памяти
+        self.query_server = QueryServer(self.query, self)
+        if not self.query_server.listen(resource_path(QUERY_SOCKET)):
+            message(f"Не удалось открыть сокет {resource_path(QUERY_SOCKET)}: "
+                    f"{self.query_server.error_string}", icon_path=None, title="Ошибка")
+
         # сигналы и слоты для обработки событий
         self.start_button.clicked.connect(self.start)
         self.pause_button.clicked.connect(self.pause)
@@ -235,7 +888,7 @@ class TimeTracker(QWidget):
         self.all_time_radio.setChecked(True)
         self.timer_radio.toggled.connect(self.set_mode)
         self.time_edit.timeChanged.connect(self.set_limit)
-        self.timer.timeout.connect(self.update)
+        self.categories_checkbox.toggled.connect(self.add_to_table)
 
         # макеты для размещения виджетов
         self.left_layout = QVBoxLayout()
@@ -259,11 +912,12 @@ class TimeTracker(QWidget):
         self.left_layout.addWidget(self.all_time_radio)
         self.left_layout.addWidget(self.timer_radio)
         self.left_layout.addWidget(self.time_edit)
+        self.right_layout.addWidget(self.categories_checkbox)
         self.right_layout.addWidget(self.process_table)
         self.main_layout.addLayout(self.left_layout)
         self.main_layout.addLayout(self.right_layout)
 
-        self.add_to_table()
+        self.load_requested.emit()
 
         self.setLayout(self.main_layout)
         self.show()
@@ -276,9 +930,8 @@ class TimeTracker(QWidget):
 
         Ничего не возвращает.
         """
-        if os.path.exists(resource_path(f"jsons/{date.today()}")):
-            with open(resource_path(f"jsons/{date.today()}"), "r") as f:
-                data = json.load(f)
+        if self.today_processes:
+            data = self.today_categories if self.categories_checkbox.isChecked() else self.today_processes
             self.chart_window = QtWidgets.QMainWindow()
             self.chart_widget = QtCharts.QChartView()
             self.chart = QtCharts.QChart()
@@ -290,7 +943,7 @@ class TimeTracker(QWidget):
             self.chart.addSeries(self.series)
             self.axis_x = QtCharts.QBarCategoryAxis()
             self.axis_y = QtCharts.QValueAxis()
-            self.axis_x.setTitleText("Приложения")
+            self.axis_x.setTitleText("Категории" if self.categories_checkbox.isChecked() else "Приложения")
             self.axis_y.setTitleText("Процент использования")
             self.chart.addAxis(self.axis_x, QtCore.Qt.AlignmentFlag.AlignBottom)
             self.chart.addAxis(self.axis_y, QtCore.Qt.AlignmentFlag.AlignLeft)
@@ -311,10 +964,9 @@ class TimeTracker(QWidget):
 
         Ничего не возвращает.
         """
-        self.make_week_file()
-        if os.path.exists(resource_path(f"jsons/weekly_summary.json")):
-            with open(resource_path(f"jsons/weekly_summary.json"), "r") as f:
-                data = json.load(f)
+        apps, categories = self.period_stats("week")
+        if apps:
+            data = categories if self.categories_checkbox.isChecked() else apps
             self.chart_window = QtWidgets.QMainWindow()
             self.chart_widget = QtCharts.QChartView()
             self.chart = QtCharts.QChart()
@@ -326,7 +978,7 @@ class TimeTracker(QWidget):
             self.chart.addSeries(self.series)
             self.axis_x = QtCharts.QBarCategoryAxis()
             self.axis_y = QtCharts.QValueAxis()
-            self.axis_x.setTitleText("Приложения")
+            self.axis_x.setTitleText("Категории" if self.categories_checkbox.isChecked() else "Приложения")
             self.axis_y.setTitleText("Процент использования")
             self.chart.addAxis(self.axis_x, QtCore.Qt.AlignmentFlag.AlignBottom)
             self.chart.addAxis(self.axis_y, QtCore.Qt.AlignmentFlag.AlignLeft)
@@ -336,6 +988,8 @@ class TimeTracker(QWidget):
             self.chart_widget.setChart(self.chart)
             self.chart_window.setCentralWidget(self.chart_widget)
             self.chart_window.show()
+        else:
+            message("Статистика за неделю не найдена")
 
     def show_diagram_all_time(self) -> None:
         """
@@ -349,14 +1003,15 @@ class TimeTracker(QWidget):
         self.chart_widget = QtCharts.QChartView()
         self.chart = QtCharts.QChart()
         self.series = QtCharts.QBarSeries()
-        for app, time in self.processes.items():
+        data = self.category_processes if self.categories_checkbox.isChecked() else self.processes
+        for app, time in data.items():
             bar = QtCharts.QBarSet(app)
             bar.append(time / self.sum_values() * 100)
             self.series.append(bar)
         self.chart.addSeries(self.series)
         self.axis_x = QtCharts.QBarCategoryAxis()
         self.axis_y = QtCharts.QValueAxis()
-        self.axis_x.setTitleText("Приложения")
+        self.axis_x.setTitleText("Категории" if self.categories_checkbox.isChecked() else "Приложения")
         self.axis_y.setTitleText("Процент использования")
         self.chart.addAxis(self.axis_x, QtCore.Qt.AlignmentFlag.AlignBottom)
         self.chart.addAxis(self.axis_y, QtCore.Qt.AlignmentFlag.AlignLeft)
@@ -433,101 +1088,96 @@ class TimeTracker(QWidget):
             total += value
         return total
 
-    def send_to_telegram(self) -> None:
+    def period_stats(self, period: str) -> tuple:
         """
-        Отправляет отчет в виде текстового файла в чат Telegram.
+        Возвращает статистику за период из счетчиков в памяти.
 
-        Не принимает аргументов.
+        Аргументы:
+            period: "today", "week" (последние 7 дней) или "all".
 
-        Ничего не возвращает.
+        Возвращает:
+            кортеж из словарей {приложение: секунды} и {категория: секунды}.
         """
-        try:
-            message('Статистика успешно загружена', icon_path=None, title="Успешно")
-            document = open(self.path_write, "rb")  # Открыть файл со статистикой
-            url = f"https://api.telegram.org/bot{self.TOKEN}/sendDocument?chat_id={self.chat_id}"  # Сформировать URL для отправки документа
-            data = {
-                f"caption": f"Cтатистика за последние: {format_time(self.sum_values())}"}  # Добавить подпись к документу
-            requests.post(url, data=data, files={"document": document})  # Отправить POST-запрос с документом
-        except:
-            pass
-
-    def make_week_file(self):
-        result = {}
-        end_date = date.today()
-        start_date = end_date - timedelta(days=6)
-
-        for single_date in (start_date + timedelta(n) for n in range(7)):
-            date_str = single_date.strftime("%Y-%m-%d")
-            file_path = resource_path(resource_path(f"jsons/{date_str}"))
+        if period == "today":
+            return dict(self.today_processes), dict(self.today_categories)
+        if period == "all":
+            return dict(self.processes), dict(self.category_processes)
+        apps = dict(self.today_processes)
+        categories = dict(self.today_categories)
+        for day, stats in self.recent_days.items():
+            for app, seconds in stats["apps"].items():
+                apps[app] = apps.get(app, 0) + seconds
+            for category, seconds in stats["categories"].items():
+                categories[category] = categories.get(category, 0) + seconds
+        return apps, categories
+
+    def query(self, command: str) -> dict:
+        """
+        Отвечает на запрос к локальному сокету.
 
-            if os.path.exists(file_path):
-                with open(file_path, 'r') as file:
-                    data = json.load(file)
-                    for app, time in data.items():
-                        if app in result:
-                            result[app] += time
-                        else:
-                            result[app] = time
+        Аргументы:
+            command: "status", "current", "session", "today", "week" или "all".
 
-        with open(resource_path('jsons/weekly_summary.json'), 'w') as output_file:
-            json.dump(result, output_file)
+        Возвращает:
+            словарь ответа; для неизвестной команды - словарь с ключом "error".
+        """
+        if command == "current":
+            return {"current": self.current_process}
+        if command == "session":
+            return {"session": self.total_time}
+        if command == "status":
+            week_apps, _ = self.period_stats("week")
+            return {
+                "current": self.current_process,
+                "session": self.total_time,
+                "today": sum(self.today_processes.values()),
+                "week": sum(week_apps.values()),
+                "all": self.sum_values(),
+            }
+        if command in ("today", "week", "all"):
+            apps, categories = self.period_stats(command)
+            return {"total": sum(apps.values()), "apps": apps, "categories": categories}
+        return {"error": f"unknown command: {command}"}
 
     def report_all_time(self) -> None:
         """
-        Сохраняет отчет о времени, проведенном в разных приложениях, в текстовый файл и отправляет его в Telegram.
+        Передает воркеру отчет о времени, проведенном в разных приложениях, для записи в текстовый файл
+        и отправки в Telegram.
 
         Не принимает аргументов.
 
         Ничего не возвращает.
         """
         self.current_process = None
-
-        with open(self.path_write + "/stats.txt", "w") as f:
-            f.write(f"Общее время: {format_time(self.total_time)}\n\n")
-            f.write(f"Время в приложениях:\n")
-            for app, time in self.processes.items():
-                f.write(f"{{{app}: {str(datetime.timedelta(seconds=time))}}}\n")
-        self.send_to_telegram()
+        self.report_requested.emit(self.path_write + "/stats.txt", self.total_time,
+                                   dict(self.processes), dict(self.category_processes))
 
     def report_week_time(self) -> None:
         """
-        Сохраняет отчет о времени, проведенном в разных приложениях, в текстовый файл и отправляет его в Telegram.
+        Передает воркеру отчет о времени, проведенном в разных приложениях, для записи в текстовый файл
+        и отправки в Telegram.
 
         Не принимает аргументов.
 
         Ничего не возвращает.
         """
         self.current_process = None
-        self.make_week_file()
-        with open(resource_path("jsons/weekly_summary.json"), "r") as f:
-            data = dict(json.load(f))
-
-        with open(self.path_write + "/weekly_summary.txt", "w") as f:
-            f.write(f"Общее время: {format_time(self.total_time)}\n\n")
-            f.write(f"Время в приложениях:\n")
-            for app, time in data.items():
-                f.write(f"{{{app}: {str(datetime.timedelta(seconds=time))}}}\n")
-        self.send_to_telegram()
+        apps, categories = self.period_stats("week")
+        self.report_requested.emit(self.path_write + "/weekly_summary.txt", self.total_time, apps, categories)
 
     def report_today(self) -> None:
         """
-        Сохраняет отчет о времени, проведенном в разных приложениях, в текстовый файл и отправляет его в Telegram.
+        Передает воркеру отчет о времени, проведенном в разных приложениях, для записи в текстовый файл
+        и отправки в Telegram.
 
         Не принимает аргументов.
 
         Ничего не возвращает.
         """
         self.current_process = None
-        if os.path.exists(resource_path(f"jsons/{date.today()}")):
-            with open(resource_path(f"jsons/{date.today()}"), "r") as f:
-                data = dict(json.load(f))
-
-            with open(self.path_write + f"/{date.today()}.txt", "w") as f:
-                f.write(f"Общее время: {format_time(self.total_time)}\n\n")
-                f.write(f"Время в приложениях:\n")
-                for app, time in data.items():
-                    f.write(f"{{{app}: {str(datetime.timedelta(seconds=time))}}}\n")
-            self.send_to_telegram()
+        if self.today_processes:
+            apps, categories = self.period_stats("today")
+            self.report_requested.emit(self.path_write + f"/{self.today_date}.txt", self.total_time, apps, categories)
         else:
             message("Статистика за сегодня отсутствует")
 
@@ -539,7 +1189,12 @@ class TimeTracker(QWidget):
 
         Ничего не возвращает.
         """
+        if not self.license:
+            message("Лицензия не найдена")
+            return
         self.set_mode()
+        self.running = True
+        self.load_requested.emit()
         self.report_all_button.setEnabled(True)
         self.report_week_button.setEnabled(True)
         self.report_today_button.setEnabled(True)
@@ -549,7 +1204,7 @@ class TimeTracker(QWidget):
         self.pause_button.setEnabled(True)
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
-        self.timer.start(1000)
+        self.start_requested.emit()
         message('Считывание процессов начато', icon_path=None, title="Успешно")
 
     def pause(self) -> None:
@@ -567,8 +1222,10 @@ class TimeTracker(QWidget):
         self.report_week_button.setEnabled(True)
         self.report_today_button.setEnabled(True)
         self.current_process = None
-        self.timer.stop()
+        self.running = False
+        self.stop_requested.emit()
         self.pause_time = QTime.currentTime()
+        self.query_server.publish()
 
     # Метод для обработки нажатия на кнопку Стоп
     def stop(self) -> None:
@@ -586,13 +1243,15 @@ class TimeTracker(QWidget):
         self.pause_button.setEnabled(False)
         self.stop_button.setEnabled(False)
         self.start_button.setEnabled(True)
-        self.timer.stop()
+        self.running = False
+        self.stop_requested.emit()
         self.current_process = None
         self.current_process = None
         self.start_time = None
         self.total_time = 0
         # self.processes = {}
         self.clear_table()
+        self.query_server.publish()
 
         message('Считывание процессов завершено', icon_path=None, title="Успешно")
 
@@ -604,17 +1263,15 @@ class TimeTracker(QWidget):
 
         Ничего не возвращает.
         """
-        if os.path.exists(resource_path(f"jsons/{date.today()}")):
-            with open(resource_path(f"jsons/{date.today()}"), "r") as f:
-                data = dict(json.load(f))
-            self.process_table.setRowCount(len(data))
-            row = 0
-            for app, time in data.items():
-                app_item = QTableWidgetItem(app)
-                time_item = QTableWidgetItem(str(datetime.timedelta(seconds=time)))
-                self.process_table.setItem(row, 0, app_item)
-                self.process_table.setItem(row, 1, time_item)
-                row += 1
+        data = self.today_categories if self.categories_checkbox.isChecked() else self.today_processes
+        self.process_table.setRowCount(len(data))
+        row = 0
+        for app, time in data.items():
+            app_item = QTableWidgetItem(app)
+            time_item = QTableWidgetItem(str(datetime.timedelta(seconds=time)))
+            self.process_table.setItem(row, 0, app_item)
+            self.process_table.setItem(row, 1, time_item)
+            row += 1
 
     def clear_table(self) -> None:
         """
@@ -629,86 +1286,124 @@ class TimeTracker(QWidget):
             self.process_table.removeRow(i)
         self.process_table.setRowCount(0)
 
-    def add_time_stats(self, app_name: str) -> None:
+    def apply_snapshot(self, snapshot: dict) -> None:
         """
-        Увеличивает значение времени для заданного приложения на одну секунду и обновляет таблицу.
+        Заменяет статистику в памяти на присланную воркером и обновляет таблицу.
 
         Аргументы:
-            app_name: имя приложения, для которого нужно увеличить время.
+            snapshot: словарь с ключами "generation", "date", "processes", "category_processes", "today", "today_categories"
+                и "recent_days" (статистика 6 предыдущих дней: {дата: {"apps", "categories"}}).
 
         Ничего не возвращает.
         """
+        self.today_date = snapshot["date"]
+        self.processes = snapshot["processes"]
+        self.category_processes = snapshot["category_processes"]
+        self.today_processes = snapshot["today"]
+        self.today_categories = snapshot["today_categories"]
+        self.recent_days = snapshot["recent_days"]
+        self.generation = snapshot["generation"]
         self.add_to_table()
-        if app_name in self.processes:
-            self.processes[app_name] += 1
-        else:
-            self.processes[app_name] = 1
-
-        if not os.path.exists(resource_path(f"jsons/{date.today()}")):
-            x = {}
-            f = open(resource_path(f"jsons/{date.today()}"), "w")
-            y = json.dumps(x)
-            f.write(y)
-            f.close()
-
-        with open(resource_path(f"jsons/{date.today()}"), "r+") as f:
-            data = dict(json.load(f))
-            if app_name in data:
-                data[app_name] = data[app_name] + 1
-                f.seek(0)
-                json.dump(data, f, ensure_ascii=False, indent=4)
-                f.truncate()
-            else:
-                data[app_name] = 1
-                f.seek(0)
-                json.dump(data, f, ensure_ascii=False, indent=4)
-                f.truncate()
-
-        # общая статистика
-        with open(resource_path("stats.json"), "r+") as f:
-            data_set = dict(json.load(f))
-            if app_name in data_set:
-                data_set[app_name] = data_set[app_name] + 1
-                f.seek(0)
-                json.dump(data_set, f, ensure_ascii=False, indent=4)
-                f.truncate()
-            else:
-                data_set[app_name] = 1
-                f.seek(0)
-                json.dump(data_set, f, ensure_ascii=False, indent=4)
-                f.truncate()
+        self.query_server.publish()
+        # изменения, накопленные после снимка, ждали его применения
+        self.apply_deltas()
+
+    # Главный метод обработки
+    def apply_deltas(self) -> None:
+        """
+        Применяет накопленные воркером изменения: добавляет время приложениям и категориям,
+        обновляет таблицу, общее время и проверяет лимит.
+
+        Здесь нет ни опроса, ни работы с файлами: отчеты (по расписанию и при остановке
+        по лимиту) только запрашиваются у воркера, поэтому время обновления интерфейса не зависит от задержек диска, сети
+        и osascript. Оно сохраняется в apply_duration и вместе с длительностью тика воркера
+        показывается в подсказке к общему времени.
+
+        Не принимает аргументов.
+
+        Ничего не возвращает.
+        """
+        started = time.perf_counter()
+        deltas = self.worker.take_deltas(self.generation)
+        if not deltas:
+            return
+        report = False
+        for day, delta in deltas.items():
+            if day != self.today_date:
+                # вчерашний день уходит в недельную статистику, дни старше недели отбрасываются
+                self.recent_days[self.today_date] = {"apps": self.today_processes, "categories": self.today_categories}
+                week_start = str(date.fromisoformat(day) - timedelta(days=6))
+                self.recent_days = {d: stats for d, stats in self.recent_days.items() if d >= week_start}
+                self.today_date = day
+                self.today_processes = {}
+                self.today_categories = {}
+            for app, seconds in delta["apps"].items():
+                self.processes[app] = self.processes.get(app, 0) + seconds
+                self.today_processes[app] = self.today_processes.get(app, 0) + seconds
+            for category, seconds in delta["categories"].items():
+                self.category_processes[category] = self.category_processes.get(category, 0) + seconds
+                self.today_categories[category] = self.today_categories.get(category, 0) + seconds
+            self.total_time += delta["ticks"]
+            self.current_process = delta["current"]
+            report = report or delta["report"]
+        self.add_to_table()
+        self.label_total_time.setText(
+            "Прошло времени: " + (time.strftime("%H:%M:%S", time.gmtime(self.total_time))))
+        self.apply_duration = time.perf_counter() - started
+        self.label_total_time.setToolTip(
+            f"Опрос и запись: {self.worker.last_tick_duration * 1000:.1f} мс, "
+            f"обновление интерфейса: {self.apply_duration * 1000:.1f} мс")
+        self.query_server.publish()
+
+        if report:
+            self.report_all_time()
+        if self.running and self.mode == 'С лимитом' and self.total_time >= self.limit:
+            self.stop()
+
+    def show_error(self, text: str) -> None:
+        """
+        Показывает сообщение об ошибке, присланное воркером.
+
+        Аргументы:
+            text: текст ошибки.
+
+        Ничего не возвращает.
+        """
+        message(text, icon_path=None, title="Ошибка")
+
+    def show_report_sent(self) -> None:
+        """
+        Сообщает об отправке отчета по расписанию.
+
+        Не принимает аргументов.
+
+        Ничего не возвращает.
+        """
+        message('Статистика успешно загружена', icon_path=None, title="Успешно")
 
     def reset_stats(self):
-        reset_json(resource_path("stats.json"))
-        clear_folder(resource_path("jsons"))
         self.processes = {}
+        self.category_processes = {}
+        self.today_processes = {}
+        self.today_categories = {}
+        self.recent_days = {}
+        self.reset_requested.emit()
         self.clear_table()
 
-    # Главный метод обработки
-    def update(self) -> None:
+    def closeEvent(self, event) -> None:
         """
-        Считывает активное приложение, добавляет время к его значению, обновляет общее время и проверяет лимит.
+        Останавливает поток воркера при закрытии окна.
 
-        Не принимает аргументов.
+        Аргументы:
+            event: событие закрытия окна.
 
         Ничего не возвращает.
         """
-        if self.license:
-            # Отправка в определенное время
-            gmt4_time = time.gmtime(time.mktime(time.gmtime()) + 8 * 3600)  # GMT+4
-            if self.send_time == time.strftime("%H:%M:%S", gmt4_time):
-                self.report_all_time()
-            active_process = get_active_app_name()
-            self.add_time_stats(active_process)
-            self.current_process = get_active_app_name()
-            if self.mode == 'С лимитом' and self.total_time >= self.limit:
-                self.stop()
-            self.total_time += 1
-            self.label_total_time.setText(
-                "Прошло времени: " + (time.strftime("%H:%M:%S", time.gmtime(self.total_time))))
-        else:
-            message("Лицензия не найдена")
-
+        self.query_server.close()
+        self.stop_requested.emit()
+        self.worker_thread.quit()
+        self.worker_thread.wait()
+        super().closeEvent(event)
 
 app = QApplication(sys.argv)
 window = TimeTracker()